@@ -1,54 +1,231 @@
 import os
 import io
+import tempfile
 import base64
+import numpy as np
+import matplotlib
+# Charts are only ever rendered to files; never pay for an interactive backend, whoever imports us first
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 from matplotlib.figure import Figure
-from typing import Any, List
-
-def save_plot_as_html(fig: Figure, filepath: str, title: str, description: str) -> None:
-    """Save matplotlib chart as an HTML file with base64 image."""
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    plt.close(fig)
-    html_content = f"""
-<!DOCTYPE html>
-<html lang=\"en\">
+from typing import Any, Iterable, List, Union
+
+# Shared by every single-chart page; written once per output directory as style.css
+_CHART_STYLESHEET = """body{font-family:Arial,sans-serif;margin:0;padding:20px;background-color:#f5f5f5}
+.container{max-width:1200px;margin:0 auto;background-color:white;padding:30px;border-radius:10px;box-shadow:0 2px 10px rgba(0,0,0,0.1)}
+h1{color:#333;text-align:center;margin-bottom:10px}
+.description{text-align:center;color:#666;margin-bottom:30px;font-size:16px}
+.chart-container{text-align:center}
+img,.chart-container svg{max-width:100%;height:auto;border:1px solid #ddd;border-radius:5px}
+.footer{margin-top:30px;text-align:center;color:#999;font-size:14px}
+"""
+
+# Page shell for single-chart reports; filled with str.format_map in save_plot_as_html
+_CHART_HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
 <head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
-    <title>{title}</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; background-color: #f5f5f5; }}
-        .container {{ max-width: 1200px; margin: 0 auto; background: #fff; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        h1 {{ color: #333; text-align: center; }}
-        .description {{ text-align: center; color: #666; margin-bottom: 30px; }}
-        .chart-container {{ text-align: center; }}
-        img {{ max-width: 100%; height: auto; border: 1px solid #ddd; border-radius: 5px; }}
-        .footer {{ margin-top: 30px; text-align: center; color: #999; }}
-    </style>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>{title}</title>
+<link rel="stylesheet" href="style.css">
 </head>
 <body>
-    <div class=\"container\">
-        <h1>{title}</h1>
-        <p class=\"description\">{description}</p>
-        <div class=\"chart-container\">
-            <img src=\"data:image/png;base64,{image_base64}\" alt=\"{title}\">
-        </div>
-        <div class=\"footer\">Generated by Model Format Analysis Tool</div>
-    </div>
+<div class="container">
+<h1>{title}</h1>
+<p class="description">{description}</p>
+<div class="chart-container">{chart}</div>
+<div class="footer">Generated by Model Format Analysis Tool</div>
+</div>
 </body>
 </html>
 """
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-
-def should_use_log_scale(values: List[Any]) -> bool:
-    filtered = [v for v in values if v is not None and v > 0]
-    if not filtered or len(filtered) < 2:
-        return False
-    min_v = min(filtered)
-    max_v = max(filtered)
-    return max_v / min_v >= 100
\ No newline at end of file
+
+# Screen resolution; the charts are already ~2300px wide at this DPI
+PNG_DPI = 96
+
+_created_dirs = set()
+
+# The process umask can only be read by setting it, so do that once at import
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+def ensure_dir(path: str) -> None:
+    """Create an output directory once per run."""
+    if path in _created_dirs:
+        return
+    os.makedirs(path, exist_ok=True)
+    _created_dirs.add(path)
+
+def write_text_atomic(filepath: str, content: Union[str, Iterable[str]]) -> None:
+    """Write a UTF-8 text file through one large buffer and publish it atomically.
+
+    Every generated output goes through here: report pages, style.css, exported SVGs and the input stamp.
+    content may also be an iterable of string parts, which are streamed in order
+    without first being joined into one string.
+    """
+    directory = os.path.dirname(filepath)
+    ensure_dir(directory)
+    # A unique temp name per writer, so concurrent writers never clobber each other's partial file
+    fd, tmp_path = tempfile.mkstemp(dir=directory or '.', prefix=os.path.basename(filepath) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb', buffering=1 << 20) as f:
+            if isinstance(content, str):
+                f.write(content.encode('utf-8'))
+            else:
+                # The 1 MiB buffer coalesces the parts, so this is still a single write for typical pages
+                f.writelines(part.encode('utf-8') for part in content)
+        # mkstemp creates the file owner-only; publish with the permissions open() would have given it
+        os.chmod(tmp_path, 0o666 & ~_UMASK)
+        # Readers never see a half-written file
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    _written_paths.append(filepath)
+
+# Files published by write_text_atomic in this process since the last take_written_paths()
+_written_paths: List[str] = []
+
+def take_written_paths() -> List[str]:
+    """Return the files written since the last call and start a fresh record."""
+    paths = list(_written_paths)
+    _written_paths.clear()
+    return paths
+
+_stylesheet_dirs = set()
+
+def ensure_stylesheet(path: str) -> None:
+    """Write the shared chart stylesheet into an output directory once per run."""
+    if path in _stylesheet_dirs:
+        return
+    write_text_atomic(os.path.join(path, 'style.css'), _CHART_STYLESHEET)
+    _stylesheet_dirs.add(path)
+
+# One Agg-backed figure shared by every builder; it is never registered with pyplot
+_shared_figure = None
+
+def reuse_figure(figsize, nrows: int = 1, ncols: int = 1):
+    """Clear the shared figure, resize it and lay out a fresh grid of axes, like plt.subplots."""
+    global _shared_figure
+    if _shared_figure is None:
+        _shared_figure = Figure()
+    fig = _shared_figure
+    fig.clear()
+    fig.set_size_inches(figsize)
+    # clear() keeps the spacing set by the previous chart's tight_layout()
+    fig.subplots_adjust(**{k: plt.rcParams[f'figure.subplot.{k}'] for k in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')})
+    return fig, fig.subplots(nrows, ncols)
+
+def _render_chart_markup(fig: Figure, title: str, image_format: str) -> str:
+    # Builders already call tight_layout(); bbox_inches='tight' would add a second text-measuring pass
+    if image_format == 'svg':
+        buffer = io.StringIO()
+        # Fixed salt and no timestamp keep the SVG identical between runs
+        with plt.rc_context({'svg.hashsalt': 'model-format-comparision'}):
+            fig.savefig(buffer, format='svg', metadata={'Date': None})
+        svg = buffer.getvalue()
+        # Drop the XML prolog and doctype; the <svg> element is embedded inline
+        return svg[svg.index('<svg'):]
+    if image_format == 'png':
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=PNG_DPI)
+        # getbuffer() is a zero-copy view, so the PNG bytes are not duplicated before encoding
+        image_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
+        return f'<img src="data:image/png;base64,{image_base64}" alt="{title}">'
+    raise ValueError(f"Unsupported chart image format: {image_format}")
+
+def save_plot_as_html(fig: Figure, filepath: str, title: str, description: str, image_format: str = 'svg',
+                      export_path: str = None) -> None:
+    """Save matplotlib chart as an HTML file, either as inline SVG or as a base64 PNG.
+
+    export_path also writes the rendered SVG as a standalone file, without rendering it again.
+    """
+    if export_path is not None and image_format != 'svg':
+        raise ValueError(f"Only SVG charts can be exported, got: {image_format}")
+    chart = _render_chart_markup(fig, title, image_format)
+    if export_path is not None:
+        write_text_atomic(export_path, chart)
+    if fig is not _shared_figure:
+        plt.close(fig)
+    html_content = _CHART_HTML_TEMPLATE.format_map({'title': title, 'description': description, 'chart': chart})
+    ensure_stylesheet(os.path.dirname(filepath))
+    write_text_atomic(filepath, html_content)
+    print(f"Report generated: {filepath}")
+
+def _should_use_log_scale_scalar(values: List[Any]) -> bool:
+    # Single pass with a running min/max; stop as soon as the span reaches 100x
+    min_v = float('inf')
+    max_v = 0.0
+    count = 0
+    for v in values:
+        if v is None or v <= 0:
+            continue
+        count += 1
+        if v < min_v:
+            min_v = v
+        if v > max_v:
+            max_v = v
+        if count >= 2 and max_v / min_v >= 100:
+            return True
+    return False
+
+def should_use_log_scale(values: Union[List[Any], np.ndarray]) -> bool:
+    """Use a log axis when the positive values span at least two orders of magnitude.
+
+    Arrays may hold NaN and non-positive cells; only finite positive values are considered.
+    """
+    if isinstance(values, np.ndarray):
+        # Masked min/max reductions: no filtered copy of the array is made
+        positive = positive_mask(values)
+        if np.count_nonzero(positive) < 2:
+            return False
+        return bool(values.max(where=positive, initial=-np.inf) / values.min(where=positive, initial=np.inf) >= 100)
+    if len(values) < 8:
+        # NumPy setup costs more than a plain loop over a handful of bars
+        return _should_use_log_scale_scalar(values)
+    return should_use_log_scale(np.asarray(values, dtype=np.float64))
+
+def positive_mask(arr: np.ndarray) -> np.ndarray:
+    """Cells that hold real data: present and greater than zero."""
+    return np.isfinite(arr) & (arr > 0)
+
+def nonzero_mask(arr: np.ndarray) -> np.ndarray:
+    """Cells that are present and non-zero; negative values count."""
+    return np.isfinite(arr) & (arr != 0)
+
+def draw_grouped_bars(ax, arr: np.ndarray, formats: List[str], value_fmt: str, width: float = 0.12,
+                      offsets=None, shown=None, label_suffix: str = '', fontsize: int = 7,
+                      value_rotation: int = 60, missing_rotation: int = 60, **bar_kwargs) -> None:
+    """Draw one bar per format for every model column of arr, marking NaN cells as 'Missing'.
+
+    offsets defaults to bars centred on each tick; shown selects the cells that get a bar
+    and value label (positive values unless given); other cells draw nothing.
+    """
+    n_formats, n_models = arr.shape
+    x = np.arange(n_models)
+    if offsets is None:
+        offsets = (np.arange(n_formats) - n_formats / 2 + 0.5) * width
+    if shown is None:
+        shown = positive_mask(arr)
+    missing = np.isnan(arr)
+    # (formats, models) bar centres in one broadcast; only the draw calls stay per format
+    positions = x + np.asarray(offsets, dtype=np.float64)[:, np.newaxis]
+    # Reserve the x range of every slot, drawn or not, so the axes line up with sibling panels
+    if positions.size:
+        ax.update_datalim([(positions.min() - width / 2, 0), (positions.max() + width / 2, 0)])
+    for i, fmt in enumerate(formats):
+        # Only shown cells get a patch
+        if shown[i].any():
+            values = arr[i][shown[i]]
+            bars = ax.bar(positions[i][shown[i]], values, width, label=f'{fmt}{label_suffix}', zorder=2, **bar_kwargs)
+            ax.bar_label(bars, labels=[value_fmt.format(v) for v in values],
+                         fontsize=fontsize, rotation=value_rotation, zorder=3)
+        else:
+            # An empty bar container has no patch for the legend to take its colour from, so an
+            # all-empty format gets one NaN bar: it takes the next cycle colour for its legend
+            # swatch but draws nothing and leaves the data limits alone
+            ax.bar([np.nan], [np.nan], width, label=f'{fmt}{label_suffix}', zorder=2, **bar_kwargs)
+        # Missing cells have no bar top to anchor to (and 0 is off-axis on a log scale), so
+        # these stay plain text at a fixed height
+        for xi in positions[i][missing[i]]:
+            ax.text(xi, 0.5, 'Missing', ha='center', va='bottom', fontsize=fontsize, color='red', rotation=missing_rotation, zorder=3)
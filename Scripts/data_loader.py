@@ -1,16 +1,80 @@
-import json
 import os
-from typing import Dict, Any
+import mmap
+import functools
+from typing import Dict, Any, List, Tuple
+import numpy as np
 
+__all__ = ['DATA_PATH', 'load_raw_data', 'build_metric_tensor', 'metric_slice', 'FORMATS', 'METRICS']
+
+FORMATS = ['fbx', 'obj', 'glTF', 'glb']
+METRICS = [
+    'importTimeMs', 'sizeBeforeZipMB', 'sizeAfterZipMB', 'peakMemoryMB',
+    'textureSizeBeforeZipMB', 'textureSizeAfterZipMB', 'loadTimeMs', 'loadPeakMemoryMB',
+]
+_FORMAT_INDEX = {fmt: i for i, fmt in enumerate(FORMATS)}
+_METRIC_INDEX = {metric: k for k, metric in enumerate(METRICS)}
+
+DATA_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '../RawData/all_models_data.json'))
+
+# orjson is optional; both parsers accept bytes and raise a JSONDecodeError
+# derived from json.JSONDecodeError
+try:
+    import orjson as _json
+    _PARSES_BUFFERS = True
+except ImportError:
+    import json as _json
+    _PARSES_BUFFERS = False
+
+# Below this size a plain read() is cheaper than setting up a mapping
+_MMAP_MIN_BYTES = 1 << 20
+
+@functools.lru_cache(maxsize=1)
 def load_raw_data() -> Dict[str, Any]:
-    """Load all model data from RawData directory with error handling."""
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    data_path = os.path.join(base_dir, '../RawData/all_models_data.json')
-    data_path = os.path.normpath(data_path)
+    """Load all model data from RawData directory with error handling.
+
+    The parsed dict is cached for the lifetime of the process and shared by
+    every caller, so treat it as read-only.
+    """
+    data_path = DATA_PATH
     try:
-        with open(data_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(data_path, 'rb') as f:
+            if _PARSES_BUFFERS and os.fstat(f.fileno()).st_size >= _MMAP_MIN_BYTES:
+                # Parse straight from the page cache instead of copying the file into a bytes object
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return _json.loads(view)
+            return _json.loads(f.read())
     except FileNotFoundError:
         raise RuntimeError(f"Data file not found: {data_path}")
-    except json.JSONDecodeError as e:
-        raise RuntimeError(f"JSON decode error in {data_path}: {e}")
\ No newline at end of file
+    except _json.JSONDecodeError as e:
+        raise RuntimeError(f"JSON decode error in {data_path}: {e}")
+
+# (models_data, tensor, model_names) for the last dict seen; builders all receive the same cached dict
+_last_tensor = None
+
+def build_metric_tensor(models_data: Dict[str, Any]) -> Tuple[np.ndarray, List[str]]:
+    """Flatten models_data into a (format, model, metric) float array in one pass.
+
+    Absent formats, metrics and None values become NaN; zeros are kept as zeros.
+    The result is reused while the same models_data object is passed in.
+    """
+    global _last_tensor
+    if _last_tensor is not None and _last_tensor[0] is models_data:
+        return _last_tensor[1], _last_tensor[2]
+    model_names = list(models_data)
+    tensor = np.full((len(FORMATS), len(model_names), len(METRICS)), np.nan)
+    for j, model_data in enumerate(models_data.values()):
+        for fmt, fmt_data in model_data['formats'].items():
+            i = _FORMAT_INDEX.get(fmt)
+            if i is None:
+                continue
+            for metric, value in fmt_data.items():
+                k = _METRIC_INDEX.get(metric)
+                if k is not None and value is not None:
+                    tensor[i, j, k] = value
+    tensor.flags.writeable = False
+    _last_tensor = (models_data, tensor, model_names)
+    return tensor, model_names
+
+def metric_slice(tensor: np.ndarray, formats: List[str], metric: str) -> np.ndarray:
+    """One metric as a (len(formats), n_models) array, rows in the order of formats."""
+    return tensor[[_FORMAT_INDEX[fmt] for fmt in formats], :, _METRIC_INDEX[metric]]
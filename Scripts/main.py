@@ -1,420 +1,246 @@
 import json
 import os
-import matplotlib.pyplot as plt
 import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
 import numpy as np
 from pathlib import Path
-import io
-import base64
 import matplotlib.image as mpimg
 from matplotlib.figure import Figure
 import glob
+import functools
+import itertools
+import gc
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
 # Set font to avoid unicode minus issues
 matplotlib.rcParams['font.sans-serif'] = ['DejaVu Sans']
 matplotlib.rcParams['axes.unicode_minus'] = False
 
-from data_loader import load_raw_data
-from report_generators import (
-    create_import_time_comparison,
-    create_size_memory_comparison,
-    create_compression_texture_ratio,
-    create_gltf_glb_comparison,
-    create_model_format_compression_ratio_chart,
-    create_summary_report,
-    create_per_format_stats,
-    create_all_format_size_before,
-    create_all_format_size_after,
-    create_all_format_size_before_after,
-    create_peak_memory_usage,
-    create_combined_report
-)
-
+from data_loader import DATA_PATH, load_raw_data, build_metric_tensor, metric_slice
+from chart_utils import save_plot_as_html, should_use_log_scale, write_text_atomic, take_written_paths, ensure_stylesheet, positive_mask, nonzero_mask, draw_grouped_bars, reuse_figure
+
+# Formats compared by most charts and the grouped bar geometry they share
+COMPARED_FORMATS = ['fbx', 'obj', 'glTF']
+BAR_WIDTH = 0.12
+# One bar per compared format, starting 1.5 widths left of each tick (room for a fourth format)
+BAR_OFFSETS = (np.arange(len(COMPARED_FORMATS)) - 1.5) * BAR_WIDTH
+# Stacked size charts: (before, after, before texture, after texture) shades of each format's tab10 colour
+STACKED_BAR_COLORS = [
+    (tuple(c), tuple(np.clip(c + 0.3, 0, 1)), tuple(np.clip(c * 0.7, 0, 1)), tuple(np.clip(c * 0.7 + 0.3, 0, 1)))
+    for c in np.array(plt.get_cmap('tab10').colors[:len(COMPARED_FORMATS)])
+]
+
+@functools.lru_cache(maxsize=None)
 def get_standardized_model_name(model_name, faceCountK, textureCount):
     """Convert model name to standardized format: ModelName(face_countk/textureCount)"""
     # Extract the base name (remove suffixes like _2832k_405tex)
-    base_name = model_name.split('_')[0]
+    base_name = model_name.split('_', 1)[0]
     return f"{base_name}({faceCountK}k/{textureCount})"
 
-def filter_models_by_nonempty(models_data, data_by_format, models, face_counts):
+# (models_data, labels, wrapped_labels) for the last dict seen, like build_metric_tensor's cache
+_last_tick_labels = None
+
+def model_tick_labels(models_data, wrap=False):
+    """Standardized x tick label for every model, in build_metric_tensor order.
+
+    Builders index the result with their keep mask; wrap puts the counts on a second line.
     """
-    Filters out models where all values for a given format are empty (None or 0).
-    Returns the filtered lists and the indices of models to keep.
+    global _last_tick_labels
+    if _last_tick_labels is None or _last_tick_labels[0] is not models_data:
+        labels = np.array([get_standardized_model_name(m, d['faceCountK'], d['textureCount'])
+                           for m, d in models_data.items()], dtype=object)
+        wrapped = np.array([label.replace('(', '\n(', 1) for label in labels], dtype=object)
+        _last_tick_labels = (models_data, labels, wrapped)
+    return _last_tick_labels[2 if wrap else 1]
+
+def compression_ratio(tensor, formats):
+    """Percent saved by zipping, per format and model; NaN unless both sizes are present and non-zero."""
+    size_before = metric_slice(tensor, formats, 'sizeBeforeZipMB')
+    size_after = metric_slice(tensor, formats, 'sizeAfterZipMB')
+    measured = (size_before != 0) & (size_after != 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(measured, (1 - size_after / size_before) * 100, np.nan)
+
+def stacked_size_data(models_data, formats):
+    """Sizes for the stacked before/after charts, limited to models with any size before compression.
+
+    Missing sizes are drawn as empty bars and missing texture sizes as no texture segment,
+    so all four (formats, models) arrays come back with NaN replaced by 0.
     """
-    keep_indices = []
-    for i, model_name in enumerate(models):
-        model_data = models_data[model_name]
-        has_data = False
-        for fmt in data_by_format:
-            if fmt in model_data['formats']:
-                if data_by_format[fmt][i] is not None and data_by_format[fmt][i] > 0:
-                    has_data = True
-                    break
-        if has_data:
-            keep_indices.append(i)
-    return [models[i] for i in keep_indices], [face_counts[i] for i in keep_indices], [models_data[models[i]]['textureCount'] for i in keep_indices], keep_indices
+    tensor, model_names = build_metric_tensor(models_data)
+    size_before = metric_slice(tensor, formats, 'sizeBeforeZipMB')
+    keep = positive_mask(size_before).any(axis=0)
+    labels = model_tick_labels(models_data)[keep]
+    arrays = [np.nan_to_num(metric_slice(tensor, formats, metric)[:, keep]) for metric in
+              ('sizeBeforeZipMB', 'sizeAfterZipMB', 'textureSizeBeforeZipMB', 'textureSizeAfterZipMB')]
+    return (labels, *arrays)
 
 def create_import_time_comparison(models_data):
     """Create import time comparison chart (log/linear scale + missing annotation)"""
-    models = []
-    formats = ['fbx', 'obj', 'glTF']
-    data_by_format = {fmt: [] for fmt in formats}
-    face_counts = []
-    valid_indices = []
-    for idx, (model_name, model_data) in enumerate(models_data.items()):
-        has_data = any(
-            fmt in model_data['formats'] and 'importTimeMs' in model_data['formats'][fmt]
-            for fmt in formats
-        )
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            valid_indices.append(idx)
-    for fmt in formats:
-        for idx in valid_indices:
-            model_name = list(models_data.keys())[idx]
-            model_data = models_data[model_name]
-            if fmt in model_data['formats'] and 'importTimeMs' in model_data['formats'][fmt]:
-                data_by_format[fmt].append(model_data['formats'][fmt]['importTimeMs'] / 1000)
-            else:
-                data_by_format[fmt].append(None)
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    import_times = metric_slice(tensor, formats, 'importTimeMs') / 1000
     # Filter out models where all bars are empty
-    models, face_counts, _, keep_indices = filter_models_by_nonempty(models_data, data_by_format, models, face_counts)
-    for fmt in formats:
-        data_by_format[fmt] = [data_by_format[fmt][i] for i in keep_indices]
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
+    present = positive_mask(import_times)
+    keep = present.any(axis=0)
+    import_times, present = import_times[:, keep], present[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
+    fig, ax = reuse_figure((max(24, len(models)*1.2), 8))
     x = np.arange(len(models))
-    width = 0.12
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data_by_format[fmt] if v is not None and v > 0]
-    use_log = should_use_log_scale(all_values)
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = data_by_format[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f} s', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    width = BAR_WIDTH
+    use_log = should_use_log_scale(import_times)
+    draw_grouped_bars(ax, import_times, formats, '{:.1f} s', width, shown=present)
     ax.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel = 'Import Time (seconds, log scale)' if use_log else 'Import Time (seconds, linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title('Import Time Comparison: FBX vs OBJ vs glTF', fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
+    labels = model_tick_labels(models_data)[keep]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/import_time_comparison.html', 'Import Time Comparison', 'Comparison of import times across different 3D file formats (log/linear scale, missing data marked)')
 
 def create_size_memory_comparison(models_data):
     """Create material size and memory usage comparison chart (log/linear scale + missing annotation)"""
-    models = []
-    formats = ['fbx', 'obj', 'glTF']
-    size_before_data = {fmt: [] for fmt in formats}
-    size_after_data = {fmt: [] for fmt in formats}
-    memory_data = {fmt: [] for fmt in formats}
-    face_counts = []
-    valid_indices = []
-    for idx, (model_name, model_data) in enumerate(models_data.items()):
-        has_data = False
-        for fmt in formats:
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                if any(fmt_data.get(k, None) not in [None, 0] for k in ['sizeBeforeZipMB', 'sizeAfterZipMB', 'peakMemoryMB']):
-                    has_data = True
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            valid_indices.append(idx)
-    for fmt in formats:
-        for idx in valid_indices:
-            model_name = list(models_data.keys())[idx]
-            model_data = models_data[model_name]
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                size_before_data[fmt].append(fmt_data.get('sizeBeforeZipMB', None))
-                size_after_data[fmt].append(fmt_data.get('sizeAfterZipMB', None))
-                memory_data[fmt].append(fmt_data.get('peakMemoryMB', None))
-            else:
-                size_before_data[fmt].append(None)
-                size_after_data[fmt].append(None)
-                memory_data[fmt].append(None)
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    size_before_data = metric_slice(tensor, formats, 'sizeBeforeZipMB')
+    size_after_data = metric_slice(tensor, formats, 'sizeAfterZipMB')
+    memory_data = metric_slice(tensor, formats, 'peakMemoryMB')
     # Filter out models where all bars are empty
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, size_before_data, models, face_counts)
-    for fmt in formats:
-        size_before_data[fmt] = [size_before_data[fmt][i] for i in keep_indices]
-        size_after_data[fmt] = [size_after_data[fmt][i] for i in keep_indices]
-        memory_data[fmt] = [memory_data[fmt][i] for i in keep_indices]
+    keep = positive_mask(size_before_data).any(axis=0)
+    size_before_data, size_after_data, memory_data = size_before_data[:, keep], size_after_data[:, keep], memory_data[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
 
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(max(24, len(models)*1.2), 16))
+    labels = model_tick_labels(models_data)[keep]
+    fig, (ax1, ax2, ax3) = reuse_figure((max(24, len(models)*1.2), 16), 3, 1)
     x = np.arange(len(models))
-    width = 0.12
+    width = BAR_WIDTH
     # 1. Size before compression
-    all_values1 = []
-    for fmt in formats:
-        all_values1 += [v for v in size_before_data[fmt] if v is not None and v > 0]
-    use_log1 = should_use_log_scale(all_values1)
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = size_before_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax1.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax1.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v > 0:
-                ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.0f} MB', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    use_log1 = should_use_log_scale(size_before_data)
+    draw_grouped_bars(ax1, size_before_data, formats, '{:.0f} MB', width)
     ylabel1 = 'Size (MB, log scale)' if use_log1 else 'Size (MB, linear scale)'
     ax1.set_ylabel(ylabel1, fontsize=12)
     ax1.set_title('File Size Before Compression', fontsize=14, fontweight='bold')
     ax1.set_xticks(x)
-    ax1.set_xticklabels([get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)], rotation=45, ha='right')
+    ax1.set_xticklabels(labels, rotation=45, ha='right')
     ax1.legend()
     ax1.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log1:
         ax1.set_yscale('log')
     # 2. Size after compression
-    all_values2 = []
-    for fmt in formats:
-        all_values2 += [v for v in size_after_data[fmt] if v is not None and v > 0]
-    use_log2 = should_use_log_scale(all_values2)
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = size_after_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax2.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax2.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v > 0:
-                ax2.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.0f} MB', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    use_log2 = should_use_log_scale(size_after_data)
+    draw_grouped_bars(ax2, size_after_data, formats, '{:.0f} MB', width)
     ylabel2 = 'Size (MB, log scale)' if use_log2 else 'Size (MB, linear scale)'
     ax2.set_ylabel(ylabel2, fontsize=12)
     ax2.set_title('File Size After Compression', fontsize=14, fontweight='bold')
     ax2.set_xticks(x)
-    ax2.set_xticklabels([get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)], rotation=45, ha='right')
+    ax2.set_xticklabels(labels, rotation=45, ha='right')
     ax2.legend()
     ax2.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log2:
         ax2.set_yscale('log')
     # 3. Peak memory usage
-    all_values3 = []
-    for fmt in formats:
-        all_values3 += [v for v in memory_data[fmt] if v is not None and v > 0]
-    use_log3 = should_use_log_scale(all_values3)
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = memory_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax3.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax3.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v is not None and v > 0:
-                ax3.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.0f} MB', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    use_log3 = should_use_log_scale(memory_data)
+    draw_grouped_bars(ax3, memory_data, formats, '{:.0f} MB', width)
     ax3.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel3 = 'Memory (MB, log scale)' if use_log3 else 'Memory (MB, linear scale)'
     ax3.set_ylabel(ylabel3, fontsize=12)
     ax3.set_title('Peak Memory Usage', fontsize=14, fontweight='bold')
     ax3.set_xticks(x)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
     ax3.set_xticklabels(labels, rotation=45, ha='right')
     ax3.legend()
     ax3.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log3:
         ax3.set_yscale('log')
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/size_memory_comparison.html', 'File Size and Memory Usage Comparison', 'Comparison of file sizes (before/after compression) and peak memory usage (log/linear scale, missing data marked)')
 
 def create_compression_texture_ratio(models_data):
     """Create combined compression ratio and texture size proportion chart (log scale + missing annotation)"""
-    models = []
-    formats = ['fbx', 'obj', 'glTF']
-    compression_ratio_data = {fmt: [] for fmt in formats}
-    texture_ratio_data = {fmt: [] for fmt in formats}
-    face_counts = []
-    valid_indices = []
-    # Only keep models that have at least one format with sizeBeforeZipMB and sizeAfterZipMB
-    for idx, (model_name, model_data) in enumerate(models_data.items()):
-        has_data = False
-        for fmt in formats:
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                if fmt_data.get('sizeBeforeZipMB', None) not in [None, 0] and fmt_data.get('sizeAfterZipMB', None) not in [None, 0]:
-                    has_data = True
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            valid_indices.append(idx)
-    for fmt in formats:
-        for idx in valid_indices:
-            model_name = list(models_data.keys())[idx]
-            model_data = models_data[model_name]
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                size_before = fmt_data.get('sizeBeforeZipMB', None)
-                size_after = fmt_data.get('sizeAfterZipMB', None)
-                texture_size = fmt_data.get('textureSizeBeforeZipMB', None)
-                # Calculate compression ratio
-                if size_before not in [None, 0] and size_after not in [None, 0]:
-                    compression_ratio = (1 - size_after / size_before) * 100
-                else:
-                    compression_ratio = None
-                compression_ratio_data[fmt].append(compression_ratio)
-                # Calculate texture ratio - only treat as missing when texture_size is None or field doesn't exist
-                if size_before not in [None, 0] and texture_size is not None:
-                    texture_ratio = (texture_size / size_before) * 100
-                else:
-                    texture_ratio = None
-                texture_ratio_data[fmt].append(texture_ratio)
-            else:
-                compression_ratio_data[fmt].append(None)
-                texture_ratio_data[fmt].append(None)
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    compression_ratio_data = compression_ratio(tensor, formats)
+    # Texture ratio is only missing when the texture size itself is missing
+    size_before = metric_slice(tensor, formats, 'sizeBeforeZipMB')
+    texture_size = metric_slice(tensor, formats, 'textureSizeBeforeZipMB')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        texture_ratio_data = np.where(size_before != 0, (texture_size / size_before) * 100, np.nan)
     # Filter out models where all bars are empty
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, compression_ratio_data, models, face_counts)
-    for fmt in formats:
-        compression_ratio_data[fmt] = [compression_ratio_data[fmt][i] for i in keep_indices]
-        texture_ratio_data[fmt] = [texture_ratio_data[fmt][i] for i in keep_indices]
+    keep = positive_mask(compression_ratio_data).any(axis=0)
+    compression_ratio_data, texture_ratio_data = compression_ratio_data[:, keep], texture_ratio_data[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
 
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 12))
+    fig, ax = reuse_figure((max(24, len(models)*1.2), 12))
     x = np.arange(len(models))
-    width = 0.12
+    width = BAR_WIDTH
     # Combined chart with compression ratio and texture size proportion
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in compression_ratio_data[fmt] if v is not None and v > 0]
-        all_values += [v for v in texture_ratio_data[fmt] if v is not None and v > 0]
-    use_log = should_use_log_scale(all_values)
+    use_log = should_use_log_scale(np.concatenate([compression_ratio_data, texture_ratio_data]))
     
     # Plot compression ratio bars
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = compression_ratio_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=f'{fmt} Compression', zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f}%', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    draw_grouped_bars(ax, compression_ratio_data, formats, '{:.1f}%', width, label_suffix=' Compression')
     
     # Plot texture ratio bars with different pattern
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width + width * 2
-        values = texture_ratio_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=f'{fmt} Texture', zorder=2, alpha=0.7)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f}%', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    draw_grouped_bars(ax, texture_ratio_data, formats, '{:.1f}%', width,
+                      offsets=(np.arange(len(formats)) - len(formats)/2 + 0.5) * width + width * 2,
+                      label_suffix=' Texture', alpha=0.7)
     
     ylabel = 'Ratio (%) (log scale)' if use_log else 'Ratio (%) (linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_xlabel('Model (Face Count)', fontsize=12)
     ax.set_title('Compression Ratio and Texture Size Analysis', fontsize=16, fontweight='bold')
     ax.set_xticks(x + width)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
+    labels = model_tick_labels(models_data)[keep]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
     ax.set_ylim(bottom=0.1)
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/compression_texture_ratio.html', 'Compression Ratio and Texture Size Analysis', 'Analysis of compression efficiency and texture size proportion (log scale, missing data marked)')
 
 def create_gltf_glb_comparison(models_data):
     """Create glTF vs GLB load time and memory comparison chart (log scale + missing annotation)"""
-    models = []
     formats = ['glTF', 'glb']
-    load_time_data = {fmt: [] for fmt in formats}
-    load_memory_data = {fmt: [] for fmt in formats}
-    face_counts = []
-    valid_indices = []
-    # Only keep models that have at least one format with loadTimeMs/loadPeakMemoryMB
-    for idx, (model_name, model_data) in enumerate(models_data.items()):
-        has_data = False
-        for fmt in formats:
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                if fmt_data.get('loadTimeMs', None) not in [None, 0] or fmt_data.get('loadPeakMemoryMB', None) not in [None, 0]:
-                    has_data = True
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            valid_indices.append(idx)
-    for fmt in formats:
-        for idx in valid_indices:
-            model_name = list(models_data.keys())[idx]
-            model_data = models_data[model_name]
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                load_time = fmt_data.get('loadTimeMs', None)
-                load_memory = fmt_data.get('loadPeakMemoryMB', None)
-                load_time_data[fmt].append(load_time / 1000 if load_time not in [None, 0] else None)
-                load_memory_data[fmt].append(load_memory if load_memory not in [None, 0] else None)
-            else:
-                load_time_data[fmt].append(None)
-                load_memory_data[fmt].append(None)
+    tensor, model_names = build_metric_tensor(models_data)
+    # A zero reading means the load was not measured
+    load_time_data = metric_slice(tensor, formats, 'loadTimeMs') / 1000
+    load_time_data[load_time_data == 0] = np.nan
+    load_memory_data = metric_slice(tensor, formats, 'loadPeakMemoryMB')
+    load_memory_data[load_memory_data == 0] = np.nan
     # Filter out models where all bars are empty
-    models, face_counts, _, keep_indices = filter_models_by_nonempty(models_data, load_time_data, models, face_counts)
-    for fmt in formats:
-        load_time_data[fmt] = [load_time_data[fmt][i] for i in keep_indices]
-        load_memory_data[fmt] = [load_memory_data[fmt][i] for i in keep_indices]
+    keep = positive_mask(load_time_data).any(axis=0)
+    load_time_data, load_memory_data = load_time_data[:, keep], load_memory_data[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
 
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(max(24, len(models)*1.2), 8))
+    fig, (ax1, ax2) = reuse_figure((max(24, len(models)*1.2), 8), 1, 2)
     x = np.arange(len(models))
-    width = 0.12
+    width = BAR_WIDTH
     # Figure 1: Load time comparison
-    all_values1 = []
-    for fmt in formats:
-        all_values1 += [v for v in load_time_data[fmt] if v is not None and v > 0]
-    use_log1 = should_use_log_scale(all_values1)
-    for i, fmt in enumerate(formats):
-        offset = (i - 0.5) * width
-        values = load_time_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax1.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax1.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=10, color='red', rotation=90, zorder=3)
-            elif v > 0:
-                ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f}s', ha='center', va='bottom', fontsize=10, zorder=3)
+    use_log1 = should_use_log_scale(load_time_data)
+    draw_grouped_bars(ax1, load_time_data, formats, '{:.1f}s', width, fontsize=10, value_rotation=0, missing_rotation=90)
     ax1.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel1 = 'Load Time (seconds, log scale)' if use_log1 else 'Load Time (seconds, linear scale)'
     ax1.set_ylabel(ylabel1, fontsize=12)
     ax1.set_title('glTF vs GLB: Load Time Comparison', fontsize=14, fontweight='bold')
     ax1.set_xticks(x)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
+    labels = model_tick_labels(models_data)[keep]
     ax1.set_xticklabels(labels, rotation=45, ha='right')
     ax1.legend()
     ax1.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log1:
         ax1.set_yscale('log')
     # Figure 2: Memory usage comparison
-    all_values2 = []
-    for fmt in formats:
-        all_values2 += [v for v in load_memory_data[fmt] if v is not None and v > 0]
-    use_log2 = should_use_log_scale(all_values2)
-    for i, fmt in enumerate(formats):
-        offset = (i - 0.5) * width
-        values = load_memory_data[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax2.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax2.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=10, color='red', rotation=90, zorder=3)
-            elif v is not None and v > 0:
-                ax2.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.0f}MB', ha='center', va='bottom', fontsize=10, zorder=3)
+    use_log2 = should_use_log_scale(load_memory_data)
+    draw_grouped_bars(ax2, load_memory_data, formats, '{:.0f}MB', width, fontsize=10, value_rotation=0, missing_rotation=90)
     ax2.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel2 = 'Memory Usage (MB, log scale)' if use_log2 else 'Memory Usage (MB, linear scale)'
     ax2.set_ylabel(ylabel2, fontsize=12)
@@ -425,158 +251,39 @@ def create_gltf_glb_comparison(models_data):
     ax2.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log2:
         ax2.set_yscale('log')
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/gltf_glb_comparison.html', 'glTF vs GLB Performance Comparison', 'Comparison of load time and memory usage between glTF and GLB formats (log scale, missing data marked)')
 
-def save_plot_as_html(fig, filepath, title, description):
-    """Save matplotlib chart as an HTML file"""
-    
-    # Save chart as base64 encoded image
-    buffer = io.BytesIO()
-    fig.savefig(buffer, format='png', dpi=150, bbox_inches='tight')
-    buffer.seek(0)
-    image_base64 = base64.b64encode(buffer.getvalue()).decode()
-    plt.close(fig)
-    
-    # Create HTML content
-    html_content = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{title}</title>
-    <style>
-        body {{
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-            background-color: white;
-            padding: 30px;
-            border-radius: 10px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }}
-        h1 {{
-            color: #333;
-            text-align: center;
-            margin-bottom: 10px;
-        }}
-        .description {{
-            text-align: center;
-            color: #666;
-            margin-bottom: 30px;
-            font-size: 16px;
-        }}
-        .chart-container {{
-            text-align: center;
-        }}
-        img {{
-            max-width: 100%;
-            height: auto;
-            border: 1px solid #ddd;
-            border-radius: 5px;
-        }}
-        .footer {{
-            margin-top: 30px;
-            text-align: center;
-            color: #999;
-            font-size: 14px;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>{title}</h1>
-        <p class="description">{description}</p>
-        <div class="chart-container">
-            <img src="data:image/png;base64,{image_base64}" alt="{title}">
-        </div>
-        <div class="footer">
-            Generated by Model Format Analysis Tool
-        </div>
-    </div>
-</body>
-</html>
-"""
-    
-    # Ensure Charts directory exists
-    os.makedirs('Charts', exist_ok=True)
-    
-    # Save HTML file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"Report generated: {filepath}")
-
 def create_model_format_compression_ratio_chart(models_data):
     """Create a chart showing compression ratio for each model and each format."""
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    data_by_format = {fmt: [] for fmt in formats}
-    # Collect compression ratio for each model and format
-    for model_name, model_data in models_data.items():
-        has_any = False
-        row = []
-        for fmt in formats:
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                sb = fmt_data.get('sizeBeforeZipMB', None)
-                sa = fmt_data.get('sizeAfterZipMB', None)
-                if sb not in [None, 0] and sa not in [None, 0]:
-                    ratio = (1 - sa / sb) * 100
-                    data_by_format[fmt].append(ratio)
-                    has_any = True
-                else:
-                    data_by_format[fmt].append(None)
-            else:
-                data_by_format[fmt].append(None)
-        if has_any:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    ratios = compression_ratio(tensor, formats)
     # Filter out models where all bars are empty
-    models, face_counts, _, keep_indices = filter_models_by_nonempty(models_data, data_by_format, models, face_counts)
-    for fmt in formats:
-        data_by_format[fmt] = [data_by_format[fmt][i] for i in keep_indices]
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
+    keep = positive_mask(ratios).any(axis=0)
+    ratios = ratios[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
+    fig, ax = reuse_figure((max(24, len(models)*1.2), 8))
     x = np.arange(len(models))
-    width = 0.12
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data_by_format[fmt] if v is not None]
-    use_log = should_use_log_scale(all_values)
-    for i, fmt in enumerate(formats):
-        offset = (i - 1.5) * width
-        values = data_by_format[fmt]
-        bar_vals = [v if v is not None else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            else:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f} %', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    width = BAR_WIDTH
+    use_log = should_use_log_scale(ratios)
+    draw_grouped_bars(ax, ratios, formats, '{:.1f} %', width, offsets=BAR_OFFSETS, shown=np.isfinite(ratios))
     ax.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel = 'Compression Ratio (%) (log scale)' if use_log else 'Compression Ratio (%) (linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title('Compression Ratio by Model and Format', fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
+    labels = model_tick_labels(models_data)[keep]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/model_format_compression_ratio.html', 'Compression Ratio by Model and Format', 'Compression ratio for each model and each format (log/linear scale, missing data marked)')
 
-def create_summary_report(models_data):
-    """Create summary report"""
-    html_content = """
+# Static parts of the summary page, built once at import
+_SUMMARY_HTML_HEADER = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -676,19 +383,17 @@ def create_summary_report(models_data):
             </thead>
             <tbody>
 """
-    # Add model information
-    for model_name, model_data in models_data.items():
-        formats = ', '.join(model_data['formats'].keys())
-        faceCountK = model_data.get('faceCountK', 'N/A')
-        html_content += f"""
+
+_SUMMARY_ROW_TEMPLATE = """
                 <tr>
                     <td>{model_name}</td>
-                    <td>{faceCountK}k</td>
-                    <td>{model_data.get('textureCount', 'N/A')}</td>
+                    <td>{face_count}k</td>
+                    <td>{texture_count}</td>
                     <td>{formats}</td>
                 </tr>
 """
-    html_content += """
+
+_SUMMARY_HTML_FOOTER = """
             </tbody>
         </table>
         
@@ -714,68 +419,52 @@ def create_summary_report(models_data):
 </body>
 </html>
 """
-    # Save summary report
-    with open('Charts/index.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+
+def create_summary_report(models_data):
+    """Create summary report"""
+    # Add model information
+    rows = (_SUMMARY_ROW_TEMPLATE.format(
+        model_name=model_name,
+        face_count=model_data.get('faceCountK', 'N/A'),
+        texture_count=model_data.get('textureCount', 'N/A'),
+        formats=', '.join(model_data['formats']))
+        for model_name, model_data in models_data.items())
+    # Save summary report, streaming the rows straight into the file buffer
+    write_text_atomic('Charts/index.html', itertools.chain((_SUMMARY_HTML_HEADER,), rows, (_SUMMARY_HTML_FOOTER,)))
     print("Summary report generated: Charts/index.html")
 
 # New: One chart per format, horizontal axis is model, bars are size before compression, size after compression, compression ratio, texture ratio
 def create_per_format_stats(models_data):
-    formats = ['fbx', 'obj', 'glTF']
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
     for fmt in formats:
-        models = []
-        face_counts = []
-        textureCounts = []
-        size_before = []
-        size_after = []
-        compression_ratio = []
-        texture_ratio = []
-        for model_name, model_data in models_data.items():
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                sb = fmt_data.get('sizeBeforeZipMB', None)
-                sa = fmt_data.get('sizeAfterZipMB', None)
-                tc = fmt_data.get('textureSizeBeforeZipMB', None)
-                cr = (1 - sa / sb) * 100 if sb not in [None, 0] and sa not in [None, 0] else None
-                tr = (tc / sb) * 100 if sb not in [None, 0] and tc not in [None, 0] else None
-                # 只要四项之一有数据就保留
-                if any(x not in [None, 0] for x in [sb, sa, cr, tr]):
-                    models.append(model_name)
-                    face_counts.append(model_data['faceCountK'])
-                    textureCounts.append(model_data['textureCount'])
-                    size_before.append(sb)
-                    size_after.append(sa)
-                    compression_ratio.append(cr)
-                    texture_ratio.append(tr)
-        # 过滤掉所有四项都 missing 的模型
-        keep_indices = [i for i in range(len(models)) if any(arr[i] not in [None, 0] for arr in [size_before, size_after, compression_ratio, texture_ratio])]
-        models = [models[i] for i in keep_indices]
-        face_counts = [face_counts[i] for i in keep_indices]
-        textureCounts = [textureCounts[i] for i in keep_indices]
-        size_before = [size_before[i] for i in keep_indices]
-        size_after = [size_after[i] for i in keep_indices]
-        compression_ratio = [compression_ratio[i] for i in keep_indices]
-        texture_ratio = [texture_ratio[i] for i in keep_indices]
+        size_before = metric_slice(tensor, [fmt], 'sizeBeforeZipMB')[0]
+        size_after = metric_slice(tensor, [fmt], 'sizeAfterZipMB')[0]
+        texture_size = metric_slice(tensor, [fmt], 'textureSizeBeforeZipMB')[0]
+        has_before = nonzero_mask(size_before)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            compression_ratio = np.where(has_before & nonzero_mask(size_after), (1 - size_after / size_before) * 100, np.nan)
+            texture_ratio = np.where(has_before & nonzero_mask(texture_size), (texture_size / size_before) * 100, np.nan)
+        # 只要四项之一有数据就保留
+        series = np.stack([size_before, size_after, compression_ratio, texture_ratio])
+        keep = nonzero_mask(series).any(axis=0)
+        size_before, size_after, compression_ratio, texture_ratio = series[:, keep]
+        models = [m for m, k in zip(model_names, keep) if k]
 
         x = np.arange(len(models))
-        width = 0.12
-        fig, ax1 = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
+        width = BAR_WIDTH
+        fig, ax1 = reuse_figure((max(24, len(models)*1.2), 8))
         # MB类数据主y轴，%类数据副y轴
-        all_mb = [v for v in size_before+size_after if v not in [None, 0]]
-        all_pct = [v for v in compression_ratio+texture_ratio if v not in [None, 0]]
-        use_log_mb = should_use_log_scale(all_mb)
-        use_log_pct = should_use_log_scale(all_pct)
-        bars1 = ax1.bar(x - width, [v if v not in [None, 0] else 0 for v in size_before], width, label='Size Before (MB)', color='#1f77b4', zorder=2)
-        bars2 = ax1.bar(x, [v if v not in [None, 0] else 0 for v in size_after], width, label='Size After (MB)', color='#aec7e8', zorder=2)
+        use_log_mb = should_use_log_scale(np.concatenate([size_before, size_after]))
+        use_log_pct = should_use_log_scale(np.concatenate([compression_ratio, texture_ratio]))
         ax2 = ax1.twinx()
-        bars3 = ax2.bar(x + width, [v if v not in [None, 0] else 0 for v in compression_ratio], width, label='Compression Ratio (%)', color='#ff7f0e', zorder=2, alpha=0.7)
-        bars4 = ax2.bar(x + 2*width, [v if v not in [None, 0] else 0 for v in texture_ratio], width, label='Texture Ratio (%)', color='#ffbb78', zorder=2, alpha=0.7)
-        for bars, values, unit, axx in zip([bars1, bars2, bars3, bars4], [size_before, size_after, compression_ratio, texture_ratio], ['MB', 'MB', '%', '%'], [ax1, ax1, ax2, ax2]):
-            for bar, v in zip(bars, values):
-                if v is None:
-                    axx.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-                elif v not in [None, 0]:
-                    axx.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f} {unit}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+        for axx, values, offset, label, unit, style in [
+            (ax1, size_before, -width, 'Size Before (MB)', 'MB', {'color': '#1f77b4'}),
+            (ax1, size_after, 0, 'Size After (MB)', 'MB', {'color': '#aec7e8'}),
+            (ax2, compression_ratio, width, 'Compression Ratio (%)', '%', {'color': '#ff7f0e', 'alpha': 0.7}),
+            (ax2, texture_ratio, 2 * width, 'Texture Ratio (%)', '%', {'color': '#ffbb78', 'alpha': 0.7}),
+        ]:
+            draw_grouped_bars(axx, values[np.newaxis], [label], '{:.1f} ' + unit, width, offsets=[offset], shown=nonzero_mask(values)[np.newaxis], **style)
         ax1.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
         ylabel1 = 'File Size (MB, log scale)' if use_log_mb else 'File Size (MB, linear scale)'
         ax1.set_ylabel(ylabel1, fontsize=12)
@@ -783,7 +472,7 @@ def create_per_format_stats(models_data):
         ax2.set_ylabel(ylabel2, fontsize=12)
         ax1.set_title(f'{fmt.upper()} Stats', fontsize=16, fontweight='bold')
         ax1.set_xticks(x)
-        labels = [f'{m.split("_")[0]}\n({f}k/{t})' for m, f, t in zip(models, face_counts, textureCounts)]
+        labels = model_tick_labels(models_data, wrap=True)[keep]
         ax1.set_xticklabels(labels, rotation=45, ha='right')
         ax1.legend(loc='upper left')
         ax2.legend(loc='upper right')
@@ -792,185 +481,64 @@ def create_per_format_stats(models_data):
             ax1.set_yscale('log')
         if use_log_pct:
             ax2.set_yscale('log')
-        plt.tight_layout()
+        fig.tight_layout()
         save_plot_as_html(fig, f'Charts/{fmt}_stats.html', f'{fmt.upper()} Stats', f'Size before/after compression, compression ratio, and texture ratio for {fmt} (log/linear scale, missing data marked)')
 
-# New: Horizontal axis is model, bars are size before compression for all formats
-def create_all_format_size_before(models_data):
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    textureCounts = []
-    data = {fmt: [] for fmt in formats}
-    for model_name, model_data in models_data.items():
-        has_data = any(fmt in model_data['formats'] and model_data['formats'][fmt].get('sizeBeforeZipMB', None) not in [None, 0] for fmt in formats)
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            textureCounts.append(model_data['textureCount'])
-            for fmt in formats:
-                if fmt in model_data['formats']:
-                    v = model_data['formats'][fmt].get('sizeBeforeZipMB', None)
-                    data[fmt].append(v)
-                else:
-                    data[fmt].append(None)
+def _create_all_format_size_chart(models_data, metric_key, stage, filename):
+    """One grouped bar per format for a single size metric; stage is 'Before' or 'After'."""
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    data = metric_slice(tensor, formats, metric_key)
     # Filter out models where all bars are empty
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, data, models, face_counts)
-    for fmt in formats:
-        data[fmt] = [data[fmt][i] for i in keep_indices]
+    keep = positive_mask(data).any(axis=0)
+    data = data[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
 
     x = np.arange(len(models))
-    width = 0.12
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data[fmt] if v not in [None, 0]]
-    use_log = should_use_log_scale(all_values)
-    for i, fmt in enumerate(formats):
-        offset = (i - 1.5) * width
-        values = data[fmt]
-        bar_vals = [v if v not in [None, 0] else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v not in [None, 0]:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
+    width = BAR_WIDTH
+    fig, ax = reuse_figure((max(24, len(models)*1.2), 8))
+    use_log = should_use_log_scale(data)
+    draw_grouped_bars(ax, data, formats, '{:.1f}', width, offsets=BAR_OFFSETS, shown=nonzero_mask(data))
     ax.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
-    ylabel = 'Size Before Compression (MB, log scale)' if use_log else 'Size Before Compression (MB, linear scale)'
+    ylabel = f'Size {stage} Compression (MB, log scale)' if use_log else f'Size {stage} Compression (MB, linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
-    ax.set_title('Size Before Compression Comparison Across Formats', fontsize=16, fontweight='bold')
+    title = f'Size {stage} Compression Comparison Across Formats'
+    ax.set_title(title, fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [get_standardized_model_name(m, f, t) for m, f, t in zip(models, face_counts, textureCounts)]
+    labels = model_tick_labels(models_data)[keep]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
-    save_plot_as_html(fig, 'Charts/all_format_size_before.html', 'Size Before Compression Comparison Across Formats', 'Size before compression comparison across different formats (log scale, missing data marked)')
+    fig.tight_layout()
+    save_plot_as_html(fig, f'Charts/{filename}', title, f'Size {stage.lower()} compression comparison across different formats (log scale, missing data marked)')
+
+# New: Horizontal axis is model, bars are size before compression for all formats
+def create_all_format_size_before(models_data):
+    _create_all_format_size_chart(models_data, 'sizeBeforeZipMB', 'Before', 'all_format_size_before.html')
 
 # New: Horizontal axis is model, bars are size after compression for all formats
 def create_all_format_size_after(models_data):
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    textureCounts = []
-    data = {fmt: [] for fmt in formats}
-    for model_name, model_data in models_data.items():
-        has_data = any(fmt in model_data['formats'] and model_data['formats'][fmt].get('sizeAfterZipMB', None) not in [None, 0] for fmt in formats)
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            textureCounts.append(model_data['textureCount'])
-            for fmt in formats:
-                if fmt in model_data['formats']:
-                    v = model_data['formats'][fmt].get('sizeAfterZipMB', None)
-                    data[fmt].append(v)
-                else:
-                    data[fmt].append(None)
-    # Filter out models where all bars are empty
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, data, models, face_counts)
-    for fmt in formats:
-        data[fmt] = [data[fmt][i] for i in keep_indices]
-
-    x = np.arange(len(models))
-    width = 0.12
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data[fmt] if v not in [None, 0]]
-    use_log = should_use_log_scale(all_values)
-    for i, fmt in enumerate(formats):
-        offset = (i - 1.5) * width
-        values = data[fmt]
-        bar_vals = [v if v not in [None, 0] else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v not in [None, 0]:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
-    ax.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
-    ylabel = 'Size After Compression (MB, log scale)' if use_log else 'Size After Compression (MB, linear scale)'
-    ax.set_ylabel(ylabel, fontsize=12)
-    ax.set_title('Size After Compression Comparison Across Formats', fontsize=16, fontweight='bold')
-    ax.set_xticks(x)
-    labels = [get_standardized_model_name(m, f, t) for m, f, t in zip(models, face_counts, textureCounts)]
-    ax.set_xticklabels(labels, rotation=45, ha='right')
-    ax.legend()
-    ax.grid(True, alpha=0.3, which='both', zorder=1)
-    if use_log:
-        ax.set_yscale('log')
-    plt.tight_layout()
-    save_plot_as_html(fig, 'Charts/all_format_size_after.html', 'Size After Compression Comparison Across Formats', 'Size after compression comparison across different formats (log scale, missing data marked)')
+    _create_all_format_size_chart(models_data, 'sizeAfterZipMB', 'After', 'all_format_size_after.html')
 
-# Utility function to determine if log scale is needed
-def should_use_log_scale(values):
-    # Filter out None and non-positive values
-    filtered = [v for v in values if v is not None and v > 0]
-    if not filtered or len(filtered) < 2:
-        return False
-    min_v = min(filtered)
-    max_v = max(filtered)
-    return max_v / min_v >= 100
-
-def create_combined_report(models_data):
-    """生成合并后的综合报告，直接嵌入图片，不用iframe，不显示summary和导航，不显示Per-Format Statistics。"""
-    # 生成所有需要的图表
-    print("Generating individual charts for combined report...")
-    create_per_format_stats(models_data)
-    create_all_format_size_before_after(models_data)
-    create_peak_memory_usage(models_data)
-    create_import_time_comparison(models_data)
-    create_compression_texture_ratio(models_data)
-    create_model_format_compression_ratio_chart(models_data)
-
-    # 生成线性高图
-    create_all_format_size_before_after_linear_tall(models_data)
-
-    # 图表文件名及标题
-    chart_files = [
-        ("Charts/all_format_size_before_after.png", "All-Format Size Before/After Compression"),
-        ("Charts/model_format_compression_ratio.png", "Model-Format Compression Ratio"),
-        ("Charts/compression_texture_ratio.png", "Compression Ratio and Texture Size Analysis"),
-        ("Charts/size_memory_comparison.png", "File Size and Memory Usage Comparison"),
-        ("Charts/peak_memory_usage.png", "Peak Memory Usage"),
-        ("Charts/import_time_comparison.png", "Import Time Comparison"),
-        ("Charts/all_format_size_before_after_linear_tall.png", "All-Format Size Before/After Compression (Linear Tall)")
-    ]
-    # 直接嵌入图片
-    chart_imgs = ""
-    for file, title in chart_files:
-        if not os.path.exists(file):
-            continue
-        with open(file, "rb") as f:
-            img_b64 = base64.b64encode(f.read()).decode()
-        chart_imgs += f'''
-        <div class="section">
-            <h2>{title}</h2>
-            <div class="chart-container">
-                <img src="data:image/png;base64,{img_b64}" alt="{title}" style="width:100%;height:auto;">
-            </div>
-        </div>
-        '''
-
-    html_content = f"""
+# Static parts of the combined report, built once at import
+_COMBINED_HTML_HEADER = """
 <!DOCTYPE html>
-<html lang=\"en\">
+<html lang="en">
 <head>
-    <meta charset=\"UTF-8\">
-    <meta name=\"viewport\" content=\"width=device-width, initial-scale=1.0\">
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Combined Model Format Analysis Report</title>
     <style>
-        body {{
+        body {
             font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
             margin: 0;
             padding: 0;
             background-color: #f5f5f5;
             color: #333;
-        }}
-        .container {{
+        }
+        .container {
             width: 100vw;
             max-width: none;
             margin: 0;
@@ -978,147 +546,134 @@ def create_combined_report(models_data):
             padding: 0 0 30px 0;
             border-radius: 0;
             box-shadow: none;
-        }}
-        h1 {{
+        }
+        h1 {
             text-align: center;
             color: #2c3e50;
             margin-bottom: 30px;
             font-size: 2.5em;
             border-bottom: 3px solid #3498db;
             padding-bottom: 15px;
-        }}
-        .section {{
+        }
+        .section {
             margin: 0 0 40px 0;
             padding: 20px 40px;
             border: none;
             border-radius: 0;
             background-color: #fafafa;
-        }}
-        .section h2 {{
+        }
+        .section h2 {
             color: #34495e;
             margin-top: 0;
             font-size: 1.8em;
             border-bottom: 2px solid #3498db;
             padding-bottom: 10px;
-        }}
-        .chart-container {{
+        }
+        .chart-container {
             text-align: center;
             margin: 20px 0;
-        }}
-        img {{
+        }
+        img, .chart-container svg {
             width: 100%;
             height: auto;
             border: 1px solid #ddd;
             border-radius: 5px;
             box-shadow: 0 2px 4px rgba(0,0,0,0.08);
-        }}
+        }
     </style>
 </head>
 <body>
-    <div class=\"container\">
+    <div class="container">
         <h1>Combined Model Format Analysis Report</h1>
-        {chart_imgs}
+        """
+
+_COMBINED_SECTION_TEMPLATE = '''
+        <div class="section">
+            <h2>{title}</h2>
+            <div class="chart-container">
+                {chart}
+            </div>
+        </div>
+        '''
+
+_COMBINED_HTML_FOOTER = """
     </div>
 </body>
 </html>
     """
-    with open('Charts/combined_report.html', 'w', encoding='utf-8') as f:
-        f.write(html_content)
+
+def create_combined_report(models_data, render_charts=True):
+    """生成合并后的综合报告，直接嵌入图片，不用iframe，不显示summary和导航，不显示Per-Format Statistics。
+
+    render_charts=False skips re-rendering the charts when the caller has just generated them.
+    """
+    if render_charts:
+        # 生成所有需要的图表
+        print("Generating individual charts for combined report...")
+        create_per_format_stats(models_data)
+        create_all_format_size_before_after(models_data)
+        create_peak_memory_usage(models_data)
+        create_import_time_comparison(models_data)
+        create_compression_texture_ratio(models_data)
+        create_model_format_compression_ratio_chart(models_data)
+
+        # 生成线性高图
+        create_all_format_size_before_after_linear_tall(models_data)
+
+    # 图表文件名及标题
+    chart_files = [
+        ("Charts/all_format_size_before_after.svg", "All-Format Size Before/After Compression"),
+        ("Charts/model_format_compression_ratio.svg", "Model-Format Compression Ratio"),
+        ("Charts/compression_texture_ratio.svg", "Compression Ratio and Texture Size Analysis"),
+        ("Charts/size_memory_comparison.svg", "File Size and Memory Usage Comparison"),
+        ("Charts/peak_memory_usage.svg", "Peak Memory Usage"),
+        ("Charts/import_time_comparison.svg", "Import Time Comparison"),
+        ("Charts/all_format_size_before_after_linear_tall.svg", "All-Format Size Before/After Compression (Linear Tall)")
+    ]
+    # 直接嵌入图片
+    chart_sections = []
+    for file, title in chart_files:
+        if not os.path.exists(file):
+            continue
+        # Inline the exported SVG as-is: no base64 inflation, and it stays a vector image
+        with open(file, encoding='utf-8') as f:
+            chart_sections.append(_COMBINED_SECTION_TEMPLATE.format(title=title, chart=f.read()))
+    write_text_atomic('Charts/combined_report.html', itertools.chain((_COMBINED_HTML_HEADER,), chart_sections, (_COMBINED_HTML_FOOTER,)))
     print("Combined report generated: Charts/combined_report.html")
 
-def create_all_format_size_before_after(models_data):
-    """合并Size Before/After Compression为一张分组柱状图（下半为纹理，上半为非纹理，标注修正）"""
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    textureCounts = []
-    data_before = {fmt: [] for fmt in formats}
-    data_after = {fmt: [] for fmt in formats}
-    for model_name, model_data in models_data.items():
-        has_data = any(fmt in model_data['formats'] and (
-            model_data['formats'][fmt].get('sizeBeforeZipMB', None) not in [None, 0] or
-            model_data['formats'][fmt].get('sizeAfterZipMB', None) not in [None, 0]) for fmt in formats)
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            textureCounts.append(model_data['textureCount'])
-            for fmt in formats:
-                if fmt in model_data['formats']:
-                    data_before[fmt].append(model_data['formats'][fmt].get('sizeBeforeZipMB', None))
-                    data_after[fmt].append(model_data['formats'][fmt].get('sizeAfterZipMB', None))
-                else:
-                    data_before[fmt].append(None)
-                    data_after[fmt].append(None)
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, data_before, models, face_counts)
-    for fmt in formats:
-        data_before[fmt] = [data_before[fmt][i] for i in keep_indices]
-        data_after[fmt] = [data_after[fmt][i] for i in keep_indices]
-    x = np.arange(len(models))
-    width = 0.12
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
-    base_colors = plt.get_cmap('tab10').colors
+def _annotate_texture_share(ax, bars, bars_texture, totals, textures):
+    """总量标在堆叠柱顶部，纹理占比单独标注（纹理段太矮时引线标到柱外）"""
+    ax.bar_label(bars, labels=[f'{v:.1f}' if v != 0 else '' for v in totals], fontsize=7, rotation=60, zorder=4, color='black', fontweight='bold')
+    for bar_tex, v, t in zip(bars_texture, totals, textures):
+        if t > 0 and v > 0:
+            percent = t / v * 100
+            txt = f'{percent:.0f}%\n{t:.1f}'
+            if t > v * 0.18:
+                ax.text(bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_y() + bar_tex.get_height(), txt, ha='center', va='center', fontsize=7, color='white', zorder=5)
+            else:
+                ax.plot([bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_x() + bar_tex.get_width()/2. + 0.05], [bar_tex.get_y() + bar_tex.get_height(), bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2)], color='black', lw=0.7, zorder=6)
+                ax.text(bar_tex.get_x() + bar_tex.get_width()/2. + 0.08, bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2), txt, ha='left', va='bottom', fontsize=7, color='black', zorder=6)
+
+def _draw_stacked_size_bars(ax, x, formats, data_before, data_after, textures_before, textures_after):
+    """Before/after bar pair per format, texture segment at the bottom, shared by both stacked size charts."""
+    width = BAR_WIDTH
     for i, fmt in enumerate(formats):
         offset = (i - 1.5) * width * 2
-        before_vals = [v if v not in [None, 0] else 0 for v in data_before[fmt]]
-        after_vals = [v if v not in [None, 0] else 0 for v in data_after[fmt]]
-        texture_before = [models_data[m]['formats'][fmt].get('textureSizeBeforeZipMB', 0) if fmt in models_data[m]['formats'] else 0 for m in models]
-        texture_after = [models_data[m]['formats'][fmt].get('textureSizeAfterZipMB', 0) if fmt in models_data[m]['formats'] else 0 for m in models]
-        non_texture_before = [max(0, v-t) for v, t in zip(before_vals, texture_before)]
-        non_texture_after = [max(0, v-t) for v, t in zip(after_vals, texture_after)]
-        color_before = base_colors[i]
-        color_after = tuple(np.clip(np.array(base_colors[i]) + 0.3, 0, 1))
-        color_before_texture = tuple(np.clip(np.array(base_colors[i]) * 0.7, 0, 1))
-        color_after_texture = tuple(np.clip(np.array(base_colors[i]) * 0.7 + 0.3, 0, 1))
+        non_texture_before = np.maximum(0, data_before[i] - textures_before[i])
+        non_texture_after = np.maximum(0, data_after[i] - textures_after[i])
+        color_before, color_after, color_before_texture, color_after_texture = STACKED_BAR_COLORS[i]
         # Before: 下半为纹理，上半为非纹理
-        bars1_texture = ax.bar(x + offset, texture_before, width, label=f'{fmt} Before (Texture data)', color=color_before_texture, zorder=3)
-        bars1 = ax.bar(x + offset, non_texture_before, width, bottom=texture_before, label=f'{fmt} Before (Format data)', color=color_before, zorder=2)
+        bars1_texture = ax.bar(x + offset, textures_before[i], width, label=f'{fmt} Before (Texture data)', color=color_before_texture, zorder=3)
+        bars1 = ax.bar(x + offset, non_texture_before, width, bottom=textures_before[i], label=f'{fmt} Before (Format data)', color=color_before, zorder=2)
         # After: 下半为纹理，上半为非纹理
-        bars2_texture = ax.bar(x + offset + width, texture_after, width, label=f'{fmt} After (Texture data)', color=color_after_texture, zorder=3)
-        bars2 = ax.bar(x + offset + width, non_texture_after, width, bottom=texture_after, label=f'{fmt} After (Format data)', color=color_after, zorder=2)
-        # 标注 before
-        for idx, (bar_tex, bar_fmt, v, t) in enumerate(zip(bars1_texture, bars1, before_vals, texture_before)):
-            if v is None:
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=4)
-            elif v not in [None, 0]:
-                total_height = texture_before[idx] + non_texture_before[idx]
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., total_height, f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=4, color='black', fontweight='bold')
-                if t > 0 and v > 0:
-                    percent = t / v * 100
-                    txt = f'{percent:.0f}%\n{t:.1f}'
-                    if t > v * 0.18:
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_y() + bar_tex.get_height(), txt, ha='center', va='center', fontsize=7, color='white', zorder=5)
-                    else:
-                        ax.plot([bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_x() + bar_tex.get_width()/2. + 0.05], [bar_tex.get_y() + bar_tex.get_height(), bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2)], color='black', lw=0.7, zorder=6)
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2. + 0.08, bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2), txt, ha='left', va='bottom', fontsize=7, color='black', zorder=6)
-        # 标注 after
-        for idx, (bar_tex, bar_fmt, v, t) in enumerate(zip(bars2_texture, bars2, after_vals, texture_after)):
-            if v is None:
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=4)
-            elif v not in [None, 0]:
-                total_height = texture_after[idx] + non_texture_after[idx]
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., total_height, f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=4, color='black', fontweight='bold')
-                if t > 0 and v > 0:
-                    percent = t / v * 100
-                    txt = f'{percent:.0f}%\n{t:.1f}'
-                    if t > v * 0.18:
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_y() + bar_tex.get_height(), txt, ha='center', va='center', fontsize=7, color='white', zorder=5)
-                    else:
-                        ax.plot([bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_x() + bar_tex.get_width()/2. + 0.05], [bar_tex.get_y() + bar_tex.get_height(), bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2)], color='black', lw=0.7, zorder=6)
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2. + 0.08, bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2), txt, ha='left', va='bottom', fontsize=7, color='black', zorder=6)
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data_before[fmt] if v not in [None, 0]]
-        all_values += [v for v in data_after[fmt] if v not in [None, 0]]
-    use_log = should_use_log_scale(all_values)
-    ax.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
-    ylabel = 'File Size (MB, log scale)' if use_log else 'File Size (MB, linear scale)'
-    ax.set_ylabel(ylabel, fontsize=12)
-    ax.set_title('Size Before/After Compression Comparison Across Formats', fontsize=16, fontweight='bold')
-    ax.set_xticks(x)
-    labels = [get_standardized_model_name(m, f, t) for m, f, t in zip(models, face_counts, textureCounts)]
-    ax.set_xticklabels(labels, rotation=45, ha='right')
+        bars2_texture = ax.bar(x + offset + width, textures_after[i], width, label=f'{fmt} After (Texture data)', color=color_after_texture, zorder=3)
+        bars2 = ax.bar(x + offset + width, non_texture_after, width, bottom=textures_after[i], label=f'{fmt} After (Format data)', color=color_after, zorder=2)
+        _annotate_texture_share(ax, bars1, bars1_texture, data_before[i], textures_before[i])
+        _annotate_texture_share(ax, bars2, bars2_texture, data_after[i], textures_after[i])
+
+def _stacked_size_legend(ax):
+    """去重且顺序: Texture data在下，Format data在上"""
     handles, labels = ax.get_legend_handles_labels()
-    # 去重且顺序: Texture data在下，Format data在上
     new_labels = []
     new_handles = []
     for want in ['Before (Texture data)', 'Before (Format data)', 'After (Texture data)', 'After (Format data)']:
@@ -1127,271 +682,172 @@ def create_all_format_size_before_after(models_data):
                 new_labels.append(l)
                 new_handles.append(h)
     ax.legend(new_handles, new_labels)
+
+def create_all_format_size_before_after(models_data):
+    """合并Size Before/After Compression为一张分组柱状图（下半为纹理，上半为非纹理，标注修正）"""
+    formats = COMPARED_FORMATS
+    labels, data_before, data_after, textures_before, textures_after = stacked_size_data(models_data, formats)
+    x = np.arange(len(labels))
+    fig, ax = reuse_figure((max(24, len(labels)*1.2), 8))
+    _draw_stacked_size_bars(ax, x, formats, data_before, data_after, textures_before, textures_after)
+    use_log = should_use_log_scale(np.concatenate([data_before, data_after]))
+    ax.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
+    ylabel = 'File Size (MB, log scale)' if use_log else 'File Size (MB, linear scale)'
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.set_title('Size Before/After Compression Comparison Across Formats', fontsize=16, fontweight='bold')
+    ax.set_xticks(x)
+    ax.set_xticklabels(labels, rotation=45, ha='right')
+    _stacked_size_legend(ax)
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
-    save_plot_as_html(fig, 'Charts/all_format_size_before_after.html', 'Size Before/After Compression Comparison Across Formats', 'Comparison of file size before/after compression for each format (log scale, missing data marked)')
-    fig.savefig('Charts/all_format_size_before_after.png', dpi=150, bbox_inches='tight')
+    fig.tight_layout()
+    save_plot_as_html(fig, 'Charts/all_format_size_before_after.html', 'Size Before/After Compression Comparison Across Formats', 'Comparison of file size before/after compression for each format (log scale, missing data marked)',
+                      export_path='Charts/all_format_size_before_after.svg')
 
 # 新增：线性坐标轴+大高图
 
 def create_all_format_size_before_after_linear_tall(models_data):
     """线性坐标轴+大高图的Size Before/After Compression分组柱状图（下半为纹理，上半为非纹理，标注修正）"""
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    textureCounts = []
-    data_before = {fmt: [] for fmt in formats}
-    data_after = {fmt: [] for fmt in formats}
-    for model_name, model_data in models_data.items():
-        has_data = any(fmt in model_data['formats'] and (
-            model_data['formats'][fmt].get('sizeBeforeZipMB', None) not in [None, 0] or
-            model_data['formats'][fmt].get('sizeAfterZipMB', None) not in [None, 0]) for fmt in formats)
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            textureCounts.append(model_data['textureCount'])
-            for fmt in formats:
-                if fmt in model_data['formats']:
-                    data_before[fmt].append(model_data['formats'][fmt].get('sizeBeforeZipMB', None))
-                    data_after[fmt].append(model_data['formats'][fmt].get('sizeAfterZipMB', None))
-                else:
-                    data_before[fmt].append(None)
-                    data_after[fmt].append(None)
-    models, face_counts, textureCounts, keep_indices = filter_models_by_nonempty(models_data, data_before, models, face_counts)
-    for fmt in formats:
-        data_before[fmt] = [data_before[fmt][i] for i in keep_indices]
-        data_after[fmt] = [data_after[fmt][i] for i in keep_indices]
-    x = np.arange(len(models))
-    width = 0.12
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 32))
-    base_colors = plt.get_cmap('tab10').colors
-    for i, fmt in enumerate(formats):
-        offset = (i - 1.5) * width * 2
-        before_vals = [v if v not in [None, 0] else 0 for v in data_before[fmt]]
-        after_vals = [v if v not in [None, 0] else 0 for v in data_after[fmt]]
-        texture_before = [models_data[m]['formats'][fmt].get('textureSizeBeforeZipMB', 0) if fmt in models_data[m]['formats'] else 0 for m in models]
-        texture_after = [models_data[m]['formats'][fmt].get('textureSizeAfterZipMB', 0) if fmt in models_data[m]['formats'] else 0 for m in models]
-        non_texture_before = [max(0, v-t) for v, t in zip(before_vals, texture_before)]
-        non_texture_after = [max(0, v-t) for v, t in zip(after_vals, texture_after)]
-        color_before = base_colors[i]
-        color_after = tuple(np.clip(np.array(base_colors[i]) + 0.3, 0, 1))
-        color_before_texture = tuple(np.clip(np.array(base_colors[i]) * 0.7, 0, 1))
-        color_after_texture = tuple(np.clip(np.array(base_colors[i]) * 0.7 + 0.3, 0, 1))
-        # Before: 下半为纹理，上半为非纹理
-        bars1_texture = ax.bar(x + offset, texture_before, width, label=f'{fmt} Before (Texture data)', color=color_before_texture, zorder=3)
-        bars1 = ax.bar(x + offset, non_texture_before, width, bottom=texture_before, label=f'{fmt} Before (Format data)', color=color_before, zorder=2)
-        # After: 下半为纹理，上半为非纹理
-        bars2_texture = ax.bar(x + offset + width, texture_after, width, label=f'{fmt} After (Texture data)', color=color_after_texture, zorder=3)
-        bars2 = ax.bar(x + offset + width, non_texture_after, width, bottom=texture_after, label=f'{fmt} After (Format data)', color=color_after, zorder=2)
-        # 标注 before
-        for idx, (bar_tex, bar_fmt, v, t) in enumerate(zip(bars1_texture, bars1, before_vals, texture_before)):
-            if v is None:
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=4)
-            elif v not in [None, 0]:
-                total_height = texture_before[idx] + non_texture_before[idx]
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., total_height, f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=4, color='black', fontweight='bold')
-                if t > 0 and v > 0:
-                    percent = t / v * 100
-                    txt = f'{percent:.0f}%\n{t:.1f}'
-                    if t > v * 0.18:
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_y() + bar_tex.get_height(), txt, ha='center', va='center', fontsize=7, color='white', zorder=5)
-                    else:
-                        ax.plot([bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_x() + bar_tex.get_width()/2. + 0.05], [bar_tex.get_y() + bar_tex.get_height(), bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2)], color='black', lw=0.7, zorder=6)
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2. + 0.08, bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2), txt, ha='left', va='bottom', fontsize=7, color='black', zorder=6)
-        # 标注 after
-        for idx, (bar_tex, bar_fmt, v, t) in enumerate(zip(bars2_texture, bars2, after_vals, texture_after)):
-            if v is None:
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=4)
-            elif v not in [None, 0]:
-                total_height = texture_after[idx] + non_texture_after[idx]
-                ax.text(bar_fmt.get_x() + bar_fmt.get_width()/2., total_height, f'{v:.1f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=4, color='black', fontweight='bold')
-                if t > 0 and v > 0:
-                    percent = t / v * 100
-                    txt = f'{percent:.0f}%\n{t:.1f}'
-                    if t > v * 0.18:
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_y() + bar_tex.get_height(), txt, ha='center', va='center', fontsize=7, color='white', zorder=5)
-                    else:
-                        ax.plot([bar_tex.get_x() + bar_tex.get_width()/2., bar_tex.get_x() + bar_tex.get_width()/2. + 0.05], [bar_tex.get_y() + bar_tex.get_height(), bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2)], color='black', lw=0.7, zorder=6)
-                        ax.text(bar_tex.get_x() + bar_tex.get_width()/2. + 0.08, bar_tex.get_y() + bar_tex.get_height() + max(v*0.08, 2), txt, ha='left', va='bottom', fontsize=7, color='black', zorder=6)
+    formats = COMPARED_FORMATS
+    labels, data_before, data_after, textures_before, textures_after = stacked_size_data(models_data, formats)
+    x = np.arange(len(labels))
+    fig, ax = reuse_figure((max(24, len(labels)*1.2), 32))
+    _draw_stacked_size_bars(ax, x, formats, data_before, data_after, textures_before, textures_after)
     ax.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
     ax.set_ylabel('File Size (MB, linear scale)', fontsize=12)
     ax.set_title('Size Before/After Compression Comparison Across Formats (Linear Tall)', fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [get_standardized_model_name(m, f, t) for m, f, t in zip(models, face_counts, textureCounts)]
     ax.set_xticklabels(labels, rotation=45, ha='right')
-    handles, labels = ax.get_legend_handles_labels()
-    new_labels = []
-    new_handles = []
-    for want in ['Before (Texture data)', 'Before (Format data)', 'After (Texture data)', 'After (Format data)']:
-        for h, l in zip(handles, labels):
-            if want in l and l not in new_labels:
-                new_labels.append(l)
-                new_handles.append(h)
-    ax.legend(new_handles, new_labels)
+    _stacked_size_legend(ax)
     ax.grid(True, alpha=0.3, which='both', zorder=1)
-    plt.tight_layout()
-    save_plot_as_html(fig, 'Charts/all_format_size_before_after_linear_tall.html', 'Size Before/After Compression Comparison Across Formats (Linear Tall)', 'Size before/after compression for each format (linear scale, tall figure, missing data marked)')
-    fig.savefig('Charts/all_format_size_before_after_linear_tall.png', dpi=150, bbox_inches='tight')
+    fig.tight_layout()
+    save_plot_as_html(fig, 'Charts/all_format_size_before_after_linear_tall.html', 'Size Before/After Compression Comparison Across Formats (Linear Tall)', 'Size before/after compression for each format (linear scale, tall figure, missing data marked)',
+                      export_path='Charts/all_format_size_before_after_linear_tall.svg')
 
 # 2. 单独输出Peak Memory Usage
 
 def create_peak_memory_usage(models_data):
     """只输出Peak Memory Usage，剔除无数据格式"""
-    formats = ['fbx', 'obj', 'glTF']
-    models = []
-    face_counts = []
-    memory_data = {fmt: [] for fmt in formats}
-    for model_name, model_data in models_data.items():
-        has_data = any(fmt in model_data['formats'] and model_data['formats'][fmt].get('peakMemoryMB', None) not in [None, 0] for fmt in formats)
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            for fmt in formats:
-                if fmt in model_data['formats']:
-                    memory_data[fmt].append(model_data['formats'][fmt].get('peakMemoryMB', None))
-                else:
-                    memory_data[fmt].append(None)
+    formats = COMPARED_FORMATS
+    tensor, model_names = build_metric_tensor(models_data)
+    memory_data = metric_slice(tensor, formats, 'peakMemoryMB')
+    measured = nonzero_mask(memory_data)
+    keep = measured.any(axis=0)
+    models = [m for m, k in zip(model_names, keep) if k]
     # 剔除全为None/0的格式
-    valid_formats = [fmt for fmt in formats if any(v not in [None, 0] for v in memory_data[fmt])]
-    memory_data = {fmt: memory_data[fmt] for fmt in valid_formats}
+    valid_rows = measured[:, keep].any(axis=1)
+    valid_formats = [fmt for fmt, v in zip(formats, valid_rows) if v]
+    memory_data = memory_data[valid_rows][:, keep]
     x = np.arange(len(models))
     width = 0.8 / len(valid_formats) if valid_formats else 0.2
-    fig, ax = plt.subplots(figsize=(max(24, len(models)*1.2), 12))
-    base_colors = plt.get_cmap('tab10').colors
-    for i, fmt in enumerate(valid_formats):
-        offset = (i - (len(valid_formats)-1)/2) * width
-        values = memory_data[fmt]
-        bar_vals = [v if v not in [None, 0] else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, color=base_colors[i], zorder=2)
-        for bar, v in zip(bars, values):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-            elif v not in [None, 0]:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.0f}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
-    all_values = []
-    for fmt in valid_formats:
-        all_values += [v for v in memory_data[fmt] if v not in [None, 0]]
-    use_log = should_use_log_scale(all_values)
+    fig, ax = reuse_figure((max(24, len(models)*1.2), 12))
+    # Bars take tab10 colours in order from the default property cycle
+    draw_grouped_bars(ax, memory_data, valid_formats, '{:.0f}', width, shown=nonzero_mask(memory_data))
+    use_log = should_use_log_scale(memory_data)
     ax.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel = 'Peak Memory Usage (MB, log scale)' if use_log else 'Peak Memory Usage (MB, linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title('Peak Memory Usage', fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [get_standardized_model_name(model, face, models_data[model]["textureCount"]) for model, face in zip(models, face_counts)]
+    labels = model_tick_labels(models_data)[keep]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
-    save_plot_as_html(fig, 'Charts/peak_memory_usage.html', 'Peak Memory Usage', 'Peak memory usage for each model and format (log scale, missing data marked)')
-    fig.savefig('Charts/peak_memory_usage.png', dpi=150, bbox_inches='tight')
-
-# 3. 修改Per-Format Stats等有MB和%单位的图表为双y轴
-# 以create_per_format_stats为例，其他类似图表可仿照修改
-
-def create_per_format_stats(models_data):
-    formats = ['fbx', 'obj', 'glTF']
-    for fmt in formats:
-        models = []
-        face_counts = []
-        textureCounts = []
-        size_before = []
-        size_after = []
-        compression_ratio = []
-        texture_ratio = []
-        for model_name, model_data in models_data.items():
-            if fmt in model_data['formats']:
-                fmt_data = model_data['formats'][fmt]
-                sb = fmt_data.get('sizeBeforeZipMB', None)
-                sa = fmt_data.get('sizeAfterZipMB', None)
-                tc = fmt_data.get('textureSizeBeforeZipMB', None)
-                cr = (1 - sa / sb) * 100 if sb not in [None, 0] and sa not in [None, 0] else None
-                tr = (tc / sb) * 100 if sb not in [None, 0] and tc not in [None, 0] else None
-                if any(x not in [None, 0] for x in [sb, sa, cr, tr]):
-                    models.append(model_name)
-                    face_counts.append(model_data['faceCountK'])
-                    textureCounts.append(model_data['textureCount'])
-                    size_before.append(sb)
-                    size_after.append(sa)
-                    compression_ratio.append(cr)
-                    texture_ratio.append(tr)
-        keep_indices = [i for i in range(len(models)) if any(arr[i] not in [None, 0] for arr in [size_before, size_after, compression_ratio, texture_ratio])]
-        models = [models[i] for i in keep_indices]
-        face_counts = [face_counts[i] for i in keep_indices]
-        textureCounts = [textureCounts[i] for i in keep_indices]
-        size_before = [size_before[i] for i in keep_indices]
-        size_after = [size_after[i] for i in keep_indices]
-        compression_ratio = [compression_ratio[i] for i in keep_indices]
-        texture_ratio = [texture_ratio[i] for i in keep_indices]
-        x = np.arange(len(models))
-        width = 0.12
-        fig, ax1 = plt.subplots(figsize=(max(24, len(models)*1.2), 8))
-        # MB类数据主y轴，%类数据副y轴
-        all_mb = [v for v in size_before+size_after if v not in [None, 0]]
-        all_pct = [v for v in compression_ratio+texture_ratio if v not in [None, 0]]
-        use_log_mb = should_use_log_scale(all_mb)
-        use_log_pct = should_use_log_scale(all_pct)
-        bars1 = ax1.bar(x - width, [v if v not in [None, 0] else 0 for v in size_before], width, label='Size Before (MB)', color='#1f77b4', zorder=2)
-        bars2 = ax1.bar(x, [v if v not in [None, 0] else 0 for v in size_after], width, label='Size After (MB)', color='#aec7e8', zorder=2)
-        ax2 = ax1.twinx()
-        bars3 = ax2.bar(x + width, [v if v not in [None, 0] else 0 for v in compression_ratio], width, label='Compression Ratio (%)', color='#ff7f0e', zorder=2, alpha=0.7)
-        bars4 = ax2.bar(x + 2*width, [v if v not in [None, 0] else 0 for v in texture_ratio], width, label='Texture Ratio (%)', color='#ffbb78', zorder=2, alpha=0.7)
-        for bars, values, unit, axx in zip([bars1, bars2, bars3, bars4], [size_before, size_after, compression_ratio, texture_ratio], ['MB', 'MB', '%', '%'], [ax1, ax1, ax2, ax2]):
-            for bar, v in zip(bars, values):
-                if v is None:
-                    axx.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=7, color='red', rotation=60, zorder=3)
-                elif v not in [None, 0]:
-                    axx.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f} {unit}', ha='center', va='bottom', fontsize=7, rotation=60, zorder=3)
-        ax1.set_xlabel('Model (Face Count/Texture Count)', fontsize=12)
-        ylabel1 = 'File Size (MB, log scale)' if use_log_mb else 'File Size (MB, linear scale)'
-        ax1.set_ylabel(ylabel1, fontsize=12)
-        ylabel2 = 'Ratio (%) (log scale)' if use_log_pct else 'Ratio (%) (linear scale)'
-        ax2.set_ylabel(ylabel2, fontsize=12)
-        ax1.set_title(f'{fmt.upper()} Stats', fontsize=16, fontweight='bold')
-        ax1.set_xticks(x)
-        labels = [f'{m.split("_")[0]}\n({f}k/{t})' for m, f, t in zip(models, face_counts, textureCounts)]
-        ax1.set_xticklabels(labels, rotation=45, ha='right')
-        ax1.legend(loc='upper left')
-        ax2.legend(loc='upper right')
-        ax1.grid(True, alpha=0.3, which='both', zorder=1)
-        if use_log_mb:
-            ax1.set_yscale('log')
-        if use_log_pct:
-            ax2.set_yscale('log')
-        plt.tight_layout()
-        save_plot_as_html(fig, f'Charts/{fmt}_stats.html', f'{fmt.upper()} Stats', f'Size before/after compression, compression ratio, and texture ratio for {fmt} (log/linear scale, missing data marked)')
+    fig.tight_layout()
+    save_plot_as_html(fig, 'Charts/peak_memory_usage.html', 'Peak Memory Usage', 'Peak memory usage for each model and format (log scale, missing data marked)',
+                      export_path='Charts/peak_memory_usage.svg')
+
+# Pure functions of models_data that each write their own files, so they can render in worker processes
+CHART_BUILDERS = [
+    ("import time comparison report", create_import_time_comparison),
+    ("size and memory comparison report", create_size_memory_comparison),
+    ("compression and texture ratio report", create_compression_texture_ratio),
+    ("glTF vs GLB comparison report", create_gltf_glb_comparison),
+    ("per-format stats report", create_per_format_stats),
+    ("model-format compression ratio chart", create_model_format_compression_ratio_chart),
+    ("all-format size before comparison report", create_all_format_size_before),
+    ("all-format size after comparison report", create_all_format_size_after),
+    ("all-format size before/after comparison report", create_all_format_size_before_after),
+    ("peak memory usage report", create_peak_memory_usage),
+    ("all-format size before/after linear tall report", create_all_format_size_before_after_linear_tall),
+]
+
+# Fingerprint of the inputs the Charts directory was last generated from, followed by every file that run wrote
+INPUT_STAMP_PATH = 'Charts/.input_hash'
+
+def input_fingerprint():
+    """Hash the raw data and the scripts that render it; any change to either invalidates the charts."""
+    digest = hashlib.blake2b(digest_size=16)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    for path in [DATA_PATH] + sorted(glob.glob(os.path.join(script_dir, '*.py'))):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _run_builder(builder, models_data):
+    """Run one chart builder in a pool worker and return the files it wrote, for the parent's stamp."""
+    # A forked worker starts with a copy of the parent's record; only this builder's files belong to it
+    take_written_paths()
+    builder(models_data)
+    return take_written_paths()
+
+def charts_up_to_date(fingerprint):
+    """True when the last complete run used the same inputs and every file it wrote still exists."""
+    try:
+        with open(INPUT_STAMP_PATH, encoding='utf-8') as f:
+            stamped_fingerprint, *outputs = f.read().splitlines()
+    except (FileNotFoundError, ValueError):
+        return False
+    return stamped_fingerprint == fingerprint and all(os.path.exists(path) for path in outputs)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the model format comparison reports into Charts/.')
+    parser.add_argument('--force', action='store_true',
+                        help='regenerate the reports even if the raw data and scripts are unchanged')
+    args = parser.parse_args(argv)
     print("Starting to generate statistical reports...")
+    fingerprint = input_fingerprint()
+    if not args.force and charts_up_to_date(fingerprint):
+        print("Raw data and scripts are unchanged since the last run; reports are up to date (use --force to regenerate).")
+        return
+    # Invalidate the old stamp before any output is overwritten, so an interrupted run can never pass for complete
+    try:
+        os.remove(INPUT_STAMP_PATH)
+    except FileNotFoundError:
+        pass
     models_data = load_raw_data()
     print(f"Loaded data for {len(models_data)} models")
-    print("\nGenerating import time comparison report...")
-    create_import_time_comparison(models_data)
-    print("\nGenerating size and memory comparison report...")
-    create_size_memory_comparison(models_data)
-    print("\nGenerating compression and texture ratio report...")
-    create_compression_texture_ratio(models_data)
-    print("\nGenerating glTF vs GLB comparison report...")
-    create_gltf_glb_comparison(models_data)
-    print("\nGenerating per-format stats report...")
-    create_per_format_stats(models_data)
-    print("\nGenerating model-format compression ratio chart...")
-    create_model_format_compression_ratio_chart(models_data)
-    print("\nGenerating all-format size before comparison report...")
-    create_all_format_size_before(models_data)
-    print("\nGenerating all-format size after comparison report...")
-    create_all_format_size_after(models_data)
-    print("\nGenerating all-format size before/after comparison report...")
-    create_all_format_size_before_after(models_data)
-    print("\nGenerating peak memory usage report...")
-    create_peak_memory_usage(models_data)
-    print("\nGenerating summary report...")
-    create_summary_report(models_data)
+    workers = min(len(CHART_BUILDERS), os.cpu_count() or 1)
+    # Written once in the parent before workers start, so they never race to write it
+    ensure_stylesheet('Charts')
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = []
+            for label, builder in CHART_BUILDERS:
+                print(f"\nGenerating {label}...")
+                futures.append(pool.submit(_run_builder, builder, models_data))
+            print("\nGenerating summary report...")
+            create_summary_report(models_data)
+            # The combined report embeds SVGs the workers write, so they must be done first
+            worker_outputs = [path for future in futures for path in future.result()]
+    else:
+        worker_outputs = []
+        for label, builder in CHART_BUILDERS:
+            print(f"\nGenerating {label}...")
+            builder(models_data)
+        print("\nGenerating summary report...")
+        create_summary_report(models_data)
+        # Cleared charts leave artist reference cycles behind; free them once rendering is done
+        gc.collect()
     print("\nGenerating combined report...")
-    create_combined_report(models_data)
+    create_combined_report(models_data, render_charts=False)
+    # Recorded from the actual writes, so the skip check covers every output without a second list to maintain
+    outputs = dict.fromkeys(worker_outputs + take_written_paths())
+    # Written last, so an interrupted run is never mistaken for a complete one
+    write_text_atomic(INPUT_STAMP_PATH, '\n'.join([fingerprint, *outputs]))
     print("\nAll reports generated! Please check the HTML files in the Charts directory.")
     print("Open Charts/index.html to view the summary report.")
 
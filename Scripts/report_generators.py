@@ -1,79 +1,43 @@
 from typing import Dict, Any, List
 import numpy as np
-import matplotlib.pyplot as plt
-from chart_utils import save_plot_as_html, should_use_log_scale
+from data_loader import build_metric_tensor, metric_slice
+from chart_utils import save_plot_as_html, should_use_log_scale, positive_mask, draw_grouped_bars, reuse_figure
 
-def filter_models_by_nonempty(models_data: Dict[str, Any], data_by_format: Dict[str, List[Any]], models: List[str], face_counts: List[Any]):
-    keep_indices = []
-    for i, model_name in enumerate(models):
-        model_data = models_data[model_name]
-        has_data = False
-        for fmt in data_by_format:
-            if fmt in model_data['formats']:
-                if data_by_format[fmt][i] is not None and data_by_format[fmt][i] > 0:
-                    has_data = True
-                    break
-        if has_data:
-            keep_indices.append(i)
-    return [models[i] for i in keep_indices], [face_counts[i] for i in keep_indices], [model_data['textureCount'] for i, model_name in enumerate(models) if i in keep_indices], keep_indices
+def filter_models_by_nonempty(data_by_format: Dict[str, List[Any]]) -> np.ndarray:
+    """
+    Boolean mask over models: True where at least one format has a positive value.
+    None entries (format or metric missing) count as empty.
+    """
+    values = np.array(list(data_by_format.values()), dtype=np.float64).reshape(len(data_by_format), -1)
+    return positive_mask(values).any(axis=0)
 
 # 下面以 create_import_time_comparison 为例，其他 create_ 开头函数可依次迁移
 
 def create_import_time_comparison(models_data: Dict[str, Any]):
-    models = []
     formats = ['fbx', 'obj', 'glTF']
-    data_by_format = {fmt: [] for fmt in formats}
-    face_counts = []
-    valid_indices = []
-    for idx, (model_name, model_data) in enumerate(models_data.items()):
-        has_data = any(
-            fmt in model_data['formats'] and 'importTimeMs' in model_data['formats'][fmt]
-            for fmt in formats
-        )
-        if has_data:
-            models.append(model_name)
-            face_counts.append(model_data['faceCountK'])
-            valid_indices.append(idx)
-    for fmt in formats:
-        for idx in valid_indices:
-            model_name = list(models_data.keys())[idx]
-            model_data = models_data[model_name]
-            if fmt in model_data['formats'] and 'importTimeMs' in model_data['formats'][fmt]:
-                data_by_format[fmt].append(model_data['formats'][fmt]['importTimeMs'] / 1000)
-            else:
-                data_by_format[fmt].append(None)
-    models, face_counts, _, keep_indices = filter_models_by_nonempty(models_data, data_by_format, models, face_counts)
-    for fmt in formats:
-        data_by_format[fmt] = [data_by_format[fmt][i] for i in keep_indices]
-    fig, ax = plt.subplots(figsize=(12, 8))
+    tensor, model_names = build_metric_tensor(models_data)
+    values = metric_slice(tensor, formats, 'importTimeMs') / 1000
+    keep = filter_models_by_nonempty(dict(zip(formats, values)))
+    values = values[:, keep]
+    models = [m for m, k in zip(model_names, keep) if k]
+    face_counts = [models_data[m]['faceCountK'] for m in models]
+    fig, ax = reuse_figure((12, 8))
     x = np.arange(len(models))
     width = 0.2
-    all_values = []
-    for fmt in formats:
-        all_values += [v for v in data_by_format[fmt] if v is not None and v > 0]
-    use_log = should_use_log_scale(all_values)
-    for i, fmt in enumerate(formats):
-        offset = (i - len(formats)/2 + 0.5) * width
-        values = data_by_format[fmt]
-        bar_vals = [v if v is not None and v > 0 else 0 for v in values]
-        bars = ax.bar(x + offset, bar_vals, width, label=fmt, zorder=2)
-        for j, (bar, v) in enumerate(zip(bars, values)):
-            if v is None:
-                ax.text(bar.get_x() + bar.get_width()/2., 0.5, 'Missing', ha='center', va='bottom', fontsize=8, color='red', rotation=90, zorder=3)
-            elif v > 0:
-                ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), f'{v:.1f} s', ha='center', va='bottom', fontsize=8, zorder=3)
+    use_log = should_use_log_scale(values)
+    draw_grouped_bars(ax, values, formats, '{:.1f} s', width, fontsize=8, value_rotation=0, missing_rotation=90)
     ax.set_xlabel('Model (Face Count)', fontsize=12)
     ylabel = 'Import Time (seconds, log scale)' if use_log else 'Import Time (seconds, linear scale)'
     ax.set_ylabel(ylabel, fontsize=12)
     ax.set_title('Import Time Comparison: FBX vs OBJ vs glTF', fontsize=16, fontweight='bold')
     ax.set_xticks(x)
-    labels = [f'{model.split("_")[0]}\n({face}k faces)' for model, face in zip(models, face_counts)]
+    labels = [f'{model.split("_", 1)[0]}\n({face}k faces)' for model, face in zip(models, face_counts)]
     ax.set_xticklabels(labels, rotation=45, ha='right')
     ax.legend()
     ax.grid(True, alpha=0.3, which='both', zorder=1)
     if use_log:
         ax.set_yscale('log')
-    plt.tight_layout()
+    fig.tight_layout()
     save_plot_as_html(fig, 'Charts/import_time_comparison.html', 'Import Time Comparison', 'Comparison of import times across different 3D file formats (log/linear scale, missing data marked)')
 
 # 继续迁移其余报告生成函数